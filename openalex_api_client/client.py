@@ -1,12 +1,25 @@
 # -*- coding: utf-8 -*-
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import json
-from collections import defaultdict
-import re
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
+from .parser import OpenAlexParser, parse_work  # OpenAlexParser re-exported for backward compatibility
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib json module
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional, fall back to parsing the whole response
+    ijson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -14,181 +27,6 @@ class OpenAlexClientError(Exception):
     """Custom exception class for OpenAlexClient errors."""
     pass
 
-class OpenAlexParser:
-    """Parser class for OpenAlex JSON responses that provides digested data."""
-    
-    @staticmethod
-    def merge_and_deduplicate(data):
-        """Merges and deduplicates data with array indices."""
-        merged_data = defaultdict(set)
-        for key, value in data.items():
-            if re.search(r'\[\d+\]', key):
-                normalized_key = re.sub(r'\[\d+\]', '', key)
-                merged_data[normalized_key].add(value)
-            else:
-                merged_data[key] = {value}
-        return {k: '|'.join(sorted(v)) if len(v) > 1 else next(iter(v)) for k, v in merged_data.items()}
-
-    @staticmethod
-    def find_display_names(obj, path=""):
-        """Recursively finds all display_name fields in the JSON object."""
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                new_path = f"{path}.{key}" if path else key
-                if "display_name" in key:
-                    yield new_path, value
-                else:
-                    yield from OpenAlexParser.find_display_names(value, new_path)
-        elif isinstance(obj, list):
-            for index, item in enumerate(obj):
-                new_path = f"{path}[{index}]"
-                yield from OpenAlexParser.find_display_names(item, new_path)
-
-    @staticmethod
-    def extract_unique_country_codes(authorships):
-        """Extracts unique country codes from authorships."""
-        country_codes = set()
-        for author in authorships:
-            country_codes.update(author.get('countries', []))
-        return '|'.join(sorted(country_codes))
-
-    @staticmethod
-    def convert_publication_date(publication_date_str):
-        """Converts a publication date string to ISO format."""
-        try:
-            dt = datetime.strptime(publication_date_str, '%Y-%m-%d')
-            return dt.isoformat() + 'Z'
-        except ValueError:
-            return None
-
-    @staticmethod
-    def extract_abstract(abstract_inverted_index):
-        """Convert an abstract_inverted_index into a readable text format."""
-        if not abstract_inverted_index:
-            return "No abstract available"
-        abstract_length = max(max(pos) for pos in abstract_inverted_index.values()) + 1
-        abstract_words = [""] * abstract_length
-        for word, positions in abstract_inverted_index.items():
-            for pos in positions:
-                abstract_words[pos] = word
-        return " ".join(word for word in abstract_words if word)
-
-    @staticmethod
-    def parse_work(work_data, include_abstract=False):
-        """Parses a work JSON object into a digested format."""
-        parsed_data = {}
-        
-        # Basic fields
-        basic_fields = ['id', 'doi', 'title', 'publication_year', 'language', 'type']
-        for field in basic_fields:
-            try:
-                if field == 'doi':
-                    parsed_data[field] = work_data.get(field, '')
-                else:
-                    parsed_data[field] = work_data.get(field)
-            except Exception as e:
-                logging.warning(f"Error parsing {field}: {e}")
-
-        # IDs
-        try:
-            ids = work_data.get('ids', {})
-            parsed_data['pmid'] = ids.get('pmid', '')
-            parsed_data['mag'] = ids.get('mag', '')
-        except Exception as e:
-            logging.warning(f"Error parsing IDs: {e}")
-
-        # APC paid
-        try:
-            apc_paid_value = work_data.get('apc_paid')
-            if isinstance(apc_paid_value, dict):
-                parsed_data['apc_paid'] = apc_paid_value.get('value_usd')
-            else:
-                parsed_data['apc_paid'] = apc_paid_value
-        except Exception as e:
-            logging.warning(f"Error parsing apc_paid: {e}")
-
-        # Counts
-        count_fields = ['referenced_works_count', 'cited_by_count', 'countries_distinct_count',
-                       'institutions_distinct_count', 'locations_count', 'fwci']
-        for field in count_fields:
-            try:
-                parsed_data[field] = work_data.get(field)
-            except Exception as e:
-                logging.warning(f"Error parsing {field}: {e}")
-
-        # Primary location
-        try:
-            primary_location = work_data.get('primary_location', {}).get('source', {})
-            parsed_data['primary_location_display_name'] = primary_location.get('display_name')
-            parsed_data['primary_location_host_organization_name'] = primary_location.get('host_organization_name')
-        except Exception as e:
-            logging.warning(f"Error parsing primary_location: {e}")
-
-        # Publication date
-        try:
-            publication_date = work_data.get('publication_date')
-            if publication_date:
-                parsed_data['publication_date'] = OpenAlexParser.convert_publication_date(publication_date)
-        except Exception as e:
-            logging.warning(f"Error parsing publication_date: {e}")
-
-        # Percentiles
-        try:
-            percentiles = work_data.get('citation_normalized_percentile', {})
-            for key, value in percentiles.items():
-                parsed_data[f"percentiles_{key}"] = value
-        except Exception as e:
-            logging.warning(f"Error parsing citation_normalized_percentile: {e}")
-
-        # Open access
-        try:
-            open_access = work_data.get('open_access', {})
-            parsed_data['open_access_is_oa'] = open_access.get('is_oa')
-            parsed_data['open_access_oa_status'] = open_access.get('oa_status')
-        except Exception as e:
-            logging.warning(f"Error parsing open_access: {e}")
-
-        # Grants
-        try:
-            grants = work_data.get('grants', [])
-            for i, grant in enumerate(grants):
-                parsed_data[f"grants[{i}]_funder_display_name"] = grant.get("funder_display_name")
-        except Exception as e:
-            logging.warning(f"Error parsing grants: {e}")
-
-        # Country codes
-        try:
-            parsed_data["countries_codes"] = OpenAlexParser.extract_unique_country_codes(work_data.get("authorships", []))
-        except Exception as e:
-            logging.warning(f"Error parsing countries_codes: {e}")
-
-        # Display names
-        try:
-            display_names = {}
-            for path, value in OpenAlexParser.find_display_names(work_data):
-                if ("authorships" in path or "topics" in path or "keywords" in path or 
-                    "sustainable_development_goals" in path) and "display_name" in path:
-                    if path not in display_names:
-                        display_names[path] = []
-                    display_names[path].append(value)
-            # After collecting all values, limit to first 10 if needed (preventing massive authorships for example)
-            for path in display_names:
-                if len(display_names[path]) > 10:
-                    display_names[path] = display_names[path][:10]
-                    
-            for path, values in display_names.items():
-                parsed_data[path.replace(".","_")] = "|".join(values)
-        except Exception as e:
-            logging.warning(f"Error parsing display_names: {e}")
-
-        # Abstract
-        if include_abstract:
-            try:
-                parsed_data['abstract'] = OpenAlexParser.extract_abstract(work_data.get('abstract_inverted_index'))
-            except Exception as e:
-                logging.warning(f"Error parsing abstract: {e}")
-        return OpenAlexParser.merge_and_deduplicate(parsed_data)
-
 class OpenAlexClient:
     """
     A Python client for interacting with the OpenAlex API.
@@ -203,30 +41,68 @@ class OpenAlexClient:
     FUNDERS = "funders"
     PUBLISHERS = "publishers"
 
-    def __init__(self, api_key: str = None, default_per_page=10):
+    def __init__(self, api_key: str = None, default_per_page=10, max_workers=8):
         """
         Initializes the OpenAlexClient.
 
         Args:
             api_key (str, optional): api_key for API identification. Defaults to None.
             default_per_page (int): Default number of results per page. Defaults to 10.
+            max_workers (int): Number of pages fetched concurrently when listing all resources. Defaults to 8.
         """
         self.base_url = "https://api.openalex.org"
         self.api_key = api_key
         self.default_per_page = default_per_page
+        self.max_workers = max_workers
         self.headers = {
             'Accept': 'application/json',
-            'Accept-Encoding': 'gzip, deflate',  # Explicitly disable Brotli as it's not supported by the API
+            # Only advertise encodings urllib3 can decode here: gzip and deflate, plus br/zstd when
+            # the brotli/zstandard packages are installed, so compressed bodies are never left undecoded
+            'Accept-Encoding': ACCEPT_ENCODING,
         }
-        # Use a session for connection pooling
+        # Use a session for connection pooling, sized for concurrent page fetches
+        # and retrying rate-limited (429) or failed (5xx) requests with backoff
+        retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                        allowed_methods=["GET"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retries)
         self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(self.headers)
         logging.info(f"OpenAlexClient initialized with api_key: {self.api_key}")
 
+    @property
+    def api_key(self):
+        """The API key sent with every request."""
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, value):
+        self._api_key = value
+        # Rebuilt on assignment so requests always send the current key
+        self._base_params = {"api_key": value}
+
+    @staticmethod
+    def _parse_json(response):
+        """Decodes a JSON response body, using orjson on the raw bytes when available."""
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+
+    @staticmethod
+    def _dump_json(data):
+        """Serializes data to an indented JSON string for error messages."""
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+        return json.dumps(data, indent=2)
+
     def _build_params(self, **kwargs):
         """Helper to build request parameters, including API keys."""
-        params = {"api_key": self.api_key}
-        params.update({k: v for k, v in kwargs.items() if v is not None})
+        if not kwargs:
+            # Shared between requests, which never mutate the params they are given
+            return self._base_params
+        params = self._base_params.copy()
+        params.update((k, v) for k, v in kwargs.items() if v is not None)
         return params
 
     def _request(self, method, url, params=None, **kwargs):
@@ -240,9 +116,9 @@ class OpenAlexClient:
             error_message = f"API request failed ({method} {url}): {e}"
             if hasattr(e, 'response') and e.response is not None:
                 try:
-                    error_details = e.response.json()
+                    error_details = self._parse_json(e.response)
                     error_message += f"\nStatus Code: {e.response.status_code}"
-                    error_message += f"\nResponse: {json.dumps(error_details, indent=2)}"
+                    error_message += f"\nResponse: {self._dump_json(error_details)}"
                 except json.JSONDecodeError:
                     error_message += f"\nStatus Code: {e.response.status_code}"
                     error_message += f"\nResponse Text: {e.response.text[:500]}..."
@@ -265,10 +141,26 @@ class OpenAlexClient:
         params = self._build_params()
         logging.debug(f"Fetching single resource: GET {url}")
         response = self._request('GET', url, params=params)
-        data = response.json()
+        data = self._parse_json(response)
+        
+        if digest and api_endpoint == self.WORKS:
+            return parse_work(data, include_abstract=abstract)
+        return data
+
+    def _fetch_page(self, api_endpoint, digest=False, abstract=False, **kwargs):
+        """Fetches a single page of resources and returns the full response (results and meta)."""
+        url = f"{self.base_url}/{api_endpoint}"
+        if 'per_page' not in kwargs:
+            kwargs['per_page'] = self.default_per_page
+
+        params = self._build_params(**kwargs)
+        logging.debug(f"Listing resources (single page): GET {url} with params: {params}")
+        response = self._request('GET', url, params=params)
+        data = self._parse_json(response)
         
         if digest and api_endpoint == self.WORKS:
-            return OpenAlexParser.parse_work(data, include_abstract=abstract)
+            #data['results'] = [OpenAlexParser.parse_work(work) for work in data.get('results', [])]
+            data['results'] = [parse_work(work, include_abstract=abstract) for work in data.get('results', [])]
         return data
 
     def list_resources(self, api_endpoint, digest=False, abstract=False, **kwargs):
@@ -284,18 +176,7 @@ class OpenAlexClient:
         Returns:
             dict: A dictionary containing the results and metadata.
         """
-        url = f"{self.base_url}/{api_endpoint}"
-        if 'per_page' not in kwargs:
-            kwargs['per_page'] = self.default_per_page
-
-        params = self._build_params(**kwargs)
-        logging.debug(f"Listing resources (single page): GET {url} with params: {params}")
-        response = self._request('GET', url, params=params)
-        data = response.json()
-        
-        if digest and api_endpoint == self.WORKS:
-            #data['results'] = [OpenAlexParser.parse_work(work) for work in data.get('results', [])]
-            data['results'] = [OpenAlexParser.parse_work(work, include_abstract=abstract) for work in data.get('results', [])]
+        data = self._fetch_page(api_endpoint, digest=digest, abstract=abstract, **kwargs)
         return data.get('results', [])
 
     def get_total_count(self, api_endpoint, **kwargs):
@@ -315,13 +196,91 @@ class OpenAlexClient:
         params = self._build_params(**kwargs)
         
         try:
+            if ijson is not None:
+                # Stream the body and stop as soon as meta.count is read, without parsing the results
+                response = self._request('GET', url, params=params, stream=True)
+                with response:
+                    response.raw.decode_content = True
+                    try:
+                        return next(ijson.items(response.raw, 'meta.count'), 0)
+                    except (ijson.JSONError, urllib3.exceptions.HTTPError,
+                            requests.exceptions.RequestException) as e:
+                        logging.warning(f"Streaming total count failed, retrying with a full parse: {str(e)}")
             response = self._request('GET', url, params=params)
-            data = response.json()
+            data = self._parse_json(response)
             return data.get('meta', {}).get('count', 0)
         except OpenAlexClientError as e:
             logging.error(f"Error getting total count: {str(e)}")
             return 0
 
+    def _iter_all_pages(self, api_endpoint, digest=False, abstract=False, per_page=None, **kwargs):
+        """
+        Yields the results of every page of an endpoint, in page order, as soon as they are available.
+        Stops at the first page that fails or comes back empty.
+        """
+        if per_page is None:
+            per_page = self.default_per_page
+
+        # Remove page from kwargs if present to avoid conflicts
+        kwargs.pop('page', None)
+        
+        # Fetch the first page directly: its meta gives the total count, saving a separate round trip
+        try:
+            first_page = self._fetch_page(api_endpoint, digest=digest, abstract=abstract, page=1, per_page=per_page, **kwargs)
+        except OpenAlexClientError as e:
+            logging.error(f"Error fetching page 1: {str(e)}")
+            return
+        total_count = first_page.get('meta', {}).get('count', 0)
+        if total_count == 0:
+            logging.warning(f"No resources found for endpoint '{api_endpoint}' with given filters")
+            return
+        
+        total_pages = (total_count + per_page - 1) // per_page
+        logging.info(f"Fetching {total_count} resources from {total_pages} pages for endpoint '{api_endpoint}'")
+
+        results = first_page.get('results', [])
+        if not results:
+            logging.warning("Empty response for page 1")
+            return
+        yield results
+        del first_page, results
+
+        # Fetch the remaining pages concurrently, handing them out in page order as they complete
+        pages = {}
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.list_resources, api_endpoint, digest=digest, abstract=abstract,
+                                page=page, per_page=per_page, **kwargs): page
+                for page in range(2, total_pages + 1)
+            }
+            try:
+                for future in as_completed(futures):
+                    page = futures[future]
+                    if future.cancelled():
+                        continue
+                    try:
+                        pages[page] = future.result()
+                        logging.info(f"Fetched page {page}/{total_pages}")
+                    except OpenAlexClientError as e:
+                        logging.error(f"Error fetching page {page}: {str(e)}")
+                        pages[page] = None
+                        # Later pages are not needed anymore: stop scheduling those not started yet
+                        for pending, pending_page in futures.items():
+                            if pending_page > page:
+                                pending.cancel()
+                    while next_page in pages:
+                        results = pages.pop(next_page)
+                        if not results:
+                            if results is not None:
+                                logging.warning(f"Empty response for page {next_page}")
+                            return
+                        yield results
+                        next_page += 1
+            finally:
+                for pending in futures:
+                    pending.cancel()
+
     def list_all_resources(self, api_endpoint, digest=False, abstract=False, per_page=None, **kwargs):
         """
         Fetches ALL resources from an endpoint, handling pagination.
@@ -337,39 +296,80 @@ class OpenAlexClient:
         Returns:
             list: A list containing JSON representations of ALL matching resources.
         """
-        if per_page is None:
-            per_page = self.default_per_page
+        all_records = []
+        for results in self._iter_all_pages(api_endpoint, digest=digest, abstract=abstract, per_page=per_page, **kwargs):
+            all_records.extend(results)
 
-        # Remove page from kwargs if present to avoid conflicts
+        logging.info(f"Completed fetching {len(all_records)} resources from endpoint '{api_endpoint}'")
+        return all_records
+
+    def list_all_resources_cursor(self, api_endpoint, digest=False, abstract=False, per_page=200, **kwargs):
+        """
+        Fetches ALL resources from an endpoint using cursor pagination.
+
+        Unlike list_all_resources, each page costs the same server-side whatever its depth,
+        and results are not limited to the first 10,000 records. Pages are fetched sequentially
+        since each request needs the cursor returned by the previous one.
+
+        Args:
+            api_endpoint (str): The API endpoint name (e.g., "works", "authors").
+            digest (bool): If True, returns digested data using OpenAlexParser.
+            abstract (bool): If True, returns the abstract inside digested data.
+            per_page (int): Results per page. Defaults to 200, the maximum allowed by the API.
+            **kwargs: Additional query parameters (filter, sort, select).
+                      'page' and 'cursor' parameters are ignored as pagination is handled internally.
+
+        Returns:
+            list: A list containing JSON representations of ALL matching resources.
+        """
         kwargs.pop('page', None)
-        
-        # Get total count using the dedicated method
-        total_count = self.get_total_count(api_endpoint, **kwargs)
-        if total_count == 0:
-            logging.warning(f"No resources found for endpoint '{api_endpoint}' with given filters")
-            return []
-        
-        total_pages = (total_count + per_page - 1) // per_page
-        logging.info(f"Fetching {total_count} resources from {total_pages} pages for endpoint '{api_endpoint}'")
+        kwargs.pop('cursor', None)
 
         all_records = []
-        # Fetch all pages
-        for page in range(1, total_pages + 1):
+        cursor = '*'
+        page = 0
+        while cursor:
+            page += 1
             try:
-                response = self.list_resources(api_endpoint, digest=digest, abstract=abstract, page=page, per_page=per_page, **kwargs)
-                if response:
-                    all_records.extend(response)
-                    logging.info(f"Fetched page {page}/{total_pages} - Total records so far: {len(all_records)}")
-                else:
-                    logging.warning(f"Empty response for page {page}")
-                    break
+                data = self._fetch_page(api_endpoint, digest=digest, abstract=abstract,
+                                        cursor=cursor, per_page=per_page, **kwargs)
             except OpenAlexClientError as e:
                 logging.error(f"Error fetching page {page}: {str(e)}")
                 break
+            results = data.get('results', [])
+            if not results:
+                break
+            all_records.extend(results)
+            meta = data.get('meta', {})
+            logging.info(f"Fetched page {page} - Total records so far: {len(all_records)}/{meta.get('count')}")
+            cursor = meta.get('next_cursor')
 
         logging.info(f"Completed fetching {len(all_records)} resources from endpoint '{api_endpoint}'")
         return all_records
 
+    @staticmethod
+    def dump_jsonl(records, path):
+        """
+        Writes records (e.g. the output of list_all_works) to a JSON Lines file, one record per line.
+
+        Args:
+            records (iterable): The JSON-serializable records to write.
+            path (str): The path of the output file, overwritten if it exists.
+
+        Returns:
+            int: The number of records written.
+        """
+        count = 0
+        with open(path, "wb") as fp:
+            for record in records:
+                if orjson is not None:
+                    fp.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                else:
+                    fp.write((json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+                count += 1
+        logging.info(f"Wrote {count} records to {path}")
+        return count
+
     # Convenience methods for common endpoints
     def get_work(self, work_id, digest=False, abstract=False,):
         """Fetches a single work by ID."""
@@ -383,6 +383,37 @@ class OpenAlexClient:
         """Fetches ALL works, handling pagination."""
         return self.list_all_resources(self.WORKS, digest=digest, abstract=abstract, per_page=per_page, **kwargs)
 
+    def list_all_works_df(self, abstract=False, per_page=None, **kwargs):
+        """
+        Fetches ALL works as digested records and returns them as a pandas DataFrame.
+
+        Columns are filled page by page as the digested works arrive, so the full list of
+        digested dicts is never held in memory; fields missing from a work are left as None.
+        """
+        import pandas as pd  # imported here only, as pandas is slow to import
+
+        columns = {}
+        row = 0
+        for results in self._iter_all_pages(self.WORKS, digest=True, abstract=abstract, per_page=per_page, **kwargs):
+            for record in results:
+                for key, value in record.items():
+                    column = columns.get(key)
+                    if column is None:
+                        column = columns[key] = [None] * row
+                    column.append(value)
+                row += 1
+                if len(record) < len(columns):
+                    for column in columns.values():
+                        if len(column) < row:
+                            column.append(None)
+
+        logging.info(f"Completed fetching {row} resources from endpoint '{self.WORKS}'")
+        return pd.DataFrame(columns)
+
+    def list_all_works_cursor(self, digest=False, abstract=False, per_page=200, **kwargs):
+        """Fetches ALL works using cursor pagination (no 10,000 results limit)."""
+        return self.list_all_resources_cursor(self.WORKS, digest=digest, abstract=abstract, per_page=per_page, **kwargs)
+
     # -- Institutions --
     def get_institution(self, institution_id):
         """Fetches a single media resource by ID."""
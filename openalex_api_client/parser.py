@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+from functools import lru_cache
+from itertools import chain
+from datetime import date, datetime
+import logging
+
+# Work fields copied as-is into digested works
+BASIC_FIELDS = ('id', 'doi', 'title', 'publication_year', 'language', 'type')
+COUNT_FIELDS = ('referenced_works_count', 'cited_by_count', 'countries_distinct_count',
+                'institutions_distinct_count', 'locations_count', 'fwci')
+# Work fields whose nested display_name values are kept in digested works
+DISPLAY_NAME_ROOTS = frozenset(('authorships', 'topics', 'keywords', 'sustainable_development_goals'))
+# Maximum number of display_name values kept per digested field
+MAX_DISPLAY_NAMES = 10
+
+@lru_cache(maxsize=4096)
+def _strip_indices(key):
+    """
+    Removes list indices such as '[0]' from a flattened key without going through the regex engine.
+    The same few keys recur across every work of a listing, so results are memoized.
+    """
+    start = key.find('[')
+    if start == -1:
+        return key
+    parts = []
+    last = 0
+    length = len(key)
+    while start != -1:
+        end = start + 1
+        while end < length and key[end].isdigit():
+            end += 1
+        if end > start + 1 and end < length and key[end] == ']':
+            parts.append(key[last:start])
+            last = end + 1
+            start = key.find('[', last)
+        else:
+            start = key.find('[', start + 1)
+    parts.append(key[last:])
+    return ''.join(parts)
+
+def merge_and_deduplicate(data):
+    """Merges and deduplicates data with array indices, keeping values in their original order."""
+    merged_data = defaultdict(list)
+    for key, value in data.items():
+        normalized_key = _strip_indices(key)
+        if normalized_key != key:
+            merged_data[normalized_key].append(value)
+        else:
+            merged_data[key] = [value]
+    merged = {}
+    for k, v in merged_data.items():
+        unique = list(dict.fromkeys(v)) if len(v) > 1 else v
+        merged[k] = '|'.join(unique) if len(unique) > 1 else unique[0]
+    return merged
+
+def find_display_names(obj, path=""):
+    """Recursively finds all display_name fields in the JSON object."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            new_path = f"{path}.{key}" if path else key
+            if "display_name" in key:
+                yield new_path, value
+            else:
+                yield from find_display_names(value, new_path)
+    elif isinstance(obj, list):
+        for index, item in enumerate(obj):
+            new_path = f"{path}[{index}]"
+            yield from find_display_names(item, new_path)
+
+def _collect_display_names(obj, collector, path="", in_scope=False):
+    """
+    Recursively collects display_name values found under the authorships, topics, keywords
+    and sustainable_development_goals subtrees into collector, keyed by their path without
+    array indices (e.g. 'authorships_author_display_name'). At most 10 distinct values are kept per path.
+    """
+    if not in_scope:
+        # Only descend into the wanted fields of the work, so large subtrees such as
+        # referenced_works or abstract_inverted_index are never walked
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key in DISPLAY_NAME_ROOTS:
+                    _collect_display_names(value, collector, key, True)
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            new_path = f"{path}_{key}"
+            if "display_name" in key:
+                if value is not None:
+                    values = collector[new_path]
+                    # Repeated values (e.g. a shared institution) do not count towards the limit
+                    if value not in values and len(values) < MAX_DISPLAY_NAMES:
+                        values.append(value)
+            else:
+                _collect_display_names(value, collector, new_path, True)
+    elif isinstance(obj, list):
+        for item in obj:
+            _collect_display_names(item, collector, path, True)
+
+def extract_unique_country_codes(authorships):
+    """Extracts unique country codes from authorships."""
+    country_codes = set()
+    for author in authorships:
+        country_codes.update((author or {}).get('countries') or [])
+    return '|'.join(sorted(country_codes))
+
+def convert_publication_date(publication_date_str):
+    """Converts a publication date string to ISO format."""
+    try:
+        # OpenAlex dates are already zero-padded YYYY-MM-DD: validate them and append the time
+        year, month, day = publication_date_str[:4], publication_date_str[5:7], publication_date_str[8:]
+        if (len(publication_date_str) == 10 and publication_date_str[4] == '-'
+                and publication_date_str[7] == '-' and publication_date_str.isascii()
+                and year.isdigit() and month.isdigit() and day.isdigit()):
+            date(int(year), int(month), int(day))
+            return publication_date_str + 'T00:00:00Z'
+        dt = datetime.strptime(publication_date_str, '%Y-%m-%d')
+        return dt.isoformat() + 'Z'
+    except ValueError:
+        return None
+
+def extract_abstract(abstract_inverted_index):
+    """Convert an abstract_inverted_index into a readable text format."""
+    if not abstract_inverted_index:
+        return "No abstract available"
+    positions_all = chain.from_iterable(abstract_inverted_index.values())
+    abstract_length = max(positions_all, default=-1) + 1
+    if not abstract_length:
+        return "No abstract available"
+    # Plain list fill on purpose: a NumPy scatter into an object array measured ~3x slower
+    # at every abstract size, building the arrays costing more than the loop it replaces
+    abstract_words = [""] * abstract_length
+    for word, positions in abstract_inverted_index.items():
+        for pos in positions:
+            abstract_words[pos] = word
+    return " ".join(word for word in abstract_words if word)
+
+def parse_work(work_data, include_abstract=False):
+    """Parses a work JSON object into a digested format."""
+    parsed_data = {}
+    try:
+        # Basic fields
+        parsed_data.update({field: work_data.get(field) for field in BASIC_FIELDS})
+        if 'doi' not in work_data:
+            parsed_data['doi'] = ''
+
+        # IDs
+        ids = work_data.get('ids') or {}
+        parsed_data['pmid'] = ids.get('pmid', '')
+        parsed_data['mag'] = ids.get('mag', '')
+
+        # APC paid
+        apc_paid_value = work_data.get('apc_paid')
+        if isinstance(apc_paid_value, dict):
+            parsed_data['apc_paid'] = apc_paid_value.get('value_usd')
+        else:
+            parsed_data['apc_paid'] = apc_paid_value
+
+        # Counts
+        parsed_data.update({field: work_data.get(field) for field in COUNT_FIELDS})
+
+        # Primary location (either the location or its source may be null)
+        primary_location = (work_data.get('primary_location') or {}).get('source') or {}
+        parsed_data['primary_location_display_name'] = primary_location.get('display_name')
+        parsed_data['primary_location_host_organization_name'] = primary_location.get('host_organization_name')
+
+        # Publication date
+        publication_date = work_data.get('publication_date')
+        if publication_date:
+            parsed_data['publication_date'] = convert_publication_date(publication_date)
+
+        # Percentiles
+        percentiles = work_data.get('citation_normalized_percentile') or {}
+        for key, value in percentiles.items():
+            parsed_data[f"percentiles_{key}"] = value
+
+        # Open access
+        open_access = work_data.get('open_access') or {}
+        parsed_data['open_access_is_oa'] = open_access.get('is_oa')
+        parsed_data['open_access_oa_status'] = open_access.get('oa_status')
+
+        # Grants
+        grants = work_data.get('grants') or []
+        for i, grant in enumerate(grants):
+            if grant:
+                parsed_data[f"grants[{i}]_funder_display_name"] = grant.get("funder_display_name")
+
+        # Country codes
+        parsed_data["countries_codes"] = extract_unique_country_codes(work_data.get("authorships") or [])
+
+        # Display names (limited to the first values per path, preventing massive authorships for example)
+        display_names = defaultdict(list)
+        _collect_display_names(work_data, display_names)
+        for path, values in display_names.items():
+            parsed_data[path] = "|".join(values)
+
+        # Abstract
+        if include_abstract:
+            parsed_data['abstract'] = extract_abstract(work_data.get('abstract_inverted_index'))
+    except Exception as e:
+        logging.warning(f"Error parsing work {work_data.get('id')}: {e}")
+    return merge_and_deduplicate(parsed_data)
+
+class OpenAlexParser:
+    """Parser class for OpenAlex JSON responses that provides digested data."""
+
+    merge_and_deduplicate = staticmethod(merge_and_deduplicate)
+    find_display_names = staticmethod(find_display_names)
+    extract_unique_country_codes = staticmethod(extract_unique_country_codes)
+    convert_publication_date = staticmethod(convert_publication_date)
+    extract_abstract = staticmethod(extract_abstract)
+    parse_work = staticmethod(parse_work)
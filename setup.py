@@ -1,8 +1,16 @@
+import os
 from setuptools import setup, find_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
+# The works parser is plain Python, but it can optionally be compiled with Cython
+# for faster digests: OPENALEX_COMPILE_PARSER=1 pip install .
+ext_modules = []
+if os.environ.get("OPENALEX_COMPILE_PARSER"):
+    from Cython.Build import cythonize
+    ext_modules = cythonize(["openalex_api_client/parser.py"], compiler_directives={"language_level": "3"})
+
 setup(
     name="openalex-api-client",
     version="0.1.0",
@@ -14,6 +22,7 @@ setup(
     url="https://github.com/gegedenice/openalex-api-client",
     packages=find_packages(include=['openalex_api_client', 'openalex_api_client.*']),
     include_package_data=True,
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -32,8 +41,11 @@ setup(
         "requests>=2.25.0",
         "pandas>=1.2.0",
         "numpy>=1.19.0",
-        "urllib3[brotli]>=2.6.0"
+        "urllib3[brotli,zstd]>=2.6.0"
     ],
+    extras_require={
+        "fast": ["orjson>=3.6.0", "ijson>=3.1"],
+    },
     project_urls={
         "Bug Reports": "https://github.com/gegedenice/openalex-api-client/issues",
         "Source": "https://github.com/gegedenice/openalex-api-client",
@@ -0,0 +1,37 @@
+import logging
+
+from openalex_api_client.parser import parse_work
+
+
+def test_parse_work_with_null_nested_fields(caplog):
+    """Null nested objects must not abort the parse of the fields that follow them."""
+    work = {
+        "id": "https://openalex.org/W1",
+        "doi": None,
+        "ids": None,
+        "primary_location": {"source": None},
+        "open_access": None,
+        "citation_normalized_percentile": None,
+        "grants": [None, {"funder_display_name": "ANR"}],
+        "authorships": [
+            {"author": {"display_name": "Author 0"}, "countries": None, "institutions": None},
+            None,
+            {"author": {"display_name": "Author 1"}, "countries": ["FR"],
+             "institutions": [{"display_name": "Inst 0"}]},
+        ],
+        "topics": [{"display_name": "Topic", "subfield": None}],
+        "abstract_inverted_index": {"Hello": [0], "world": [1]},
+    }
+
+    with caplog.at_level(logging.WARNING):
+        parsed = parse_work(work, include_abstract=True)
+
+    assert not caplog.records
+    assert parsed["primary_location_display_name"] is None
+    assert parsed["open_access_is_oa"] is None
+    assert parsed["grants_funder_display_name"] == "ANR"
+    assert parsed["countries_codes"] == "FR"
+    assert parsed["authorships_author_display_name"] == "Author 0|Author 1"
+    assert parsed["authorships_institutions_display_name"] == "Inst 0"
+    assert parsed["topics_display_name"] == "Topic"
+    assert parsed["abstract"] == "Hello world"